@@ -2,10 +2,12 @@
 
 Execution flow:
  1. Load configuration (Graph + SharePoint + Azure OpenAI + optional Azure DevOps).
- 2. Acquire an application token (client credentials) for Microsoft Graph.
- 3. Resolve the target SharePoint site + drive, list files (skipping folders).
+ 2. Acquire an application token (client credentials) for Microsoft Graph, warming up the
+     Graph connection concurrently.
+ 3. Resolve the target SharePoint site + drive (cached between runs), list files (skipping folders).
  4. Let the user choose a file interactively (console input).
- 5. Download the selected file locally (avoiding overwrite collisions).
+ 5. Download the selected file locally (avoiding overwrite collisions); plain-text files are
+     decoded while they download.
  6. Extract text (supports txt/md/csv/log/pdf/docx) and send to Azure OpenAI for summarization
      using a prompt that returns a TITLE line and Markdown body.
  7. If Azure DevOps config present, parse the model output and create a work item.
@@ -18,46 +20,58 @@ import json
 import sys
 from typing import Optional
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from src.config import AppConfig
 from src.auth import GraphAuth
-from src.graph_client import GraphClient, SharePointTarget
+from src.graph_client import GraphClient, GraphRequestError, SharePointTarget
+from src import resolution_cache
 import os
 from src.llm_client import LLMClient
-from src.doc_reader import read_text_from_file
+from src.doc_reader import TEXT_EXTENSIONS, read_text_from_stream
+from src.doc_reader_cache import read_text_from_file_cached
 from src.azure_devops_client import AzureDevOpsClient
 
 
 def main(config_path: Optional[str] = None) -> int:
     cfg = AppConfig.load(config_path)
-    # Authenticate (client credentials) and acquire bearer token for Graph
+    # Authenticate (client credentials) and acquire bearer token for Graph while the Graph
+    # connection is warmed up in parallel (DNS + TLS overlap the login round-trip).
     auth = GraphAuth(cfg)
-    token = auth.get_token()
-
-    graph = GraphClient(cfg, token)
+    graph = GraphClient(cfg)
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        token_future = ex.submit(auth.get_token)
+        ex.submit(graph.warmup)
+        token = token_future.result()
+    graph.set_token(token)
 
     # Measure retrieval time (resolve site + drive + list items)
     t_retrieval_start = time.perf_counter()
-    # Resolve site + drive IDs (SharePoint identifiers)
-    site_id = graph.resolve_site()
-    drive_id = graph.resolve_drive(site_id)
-    target = SharePointTarget(site_id=site_id, drive_id=drive_id)
-
     folder = cfg.sharepoint.folder_path or None
-    items = graph.list_items(target, folder)
+    files = None
+    # Reuse site + drive IDs resolved by a previous run; a 404 means they went stale.
+    cached_ids = resolution_cache.lookup(cfg.sharepoint)
+    if cached_ids:
+        target = SharePointTarget(site_id=cached_ids[0], drive_id=cached_ids[1])
+        try:
+            files = list(graph.iter_items(target, folder))
+        except GraphRequestError as e:
+            if e.status_code != 404:
+                raise
+            resolution_cache.invalidate(cfg.sharepoint)
+    if files is None:
+        # Resolve site + drive IDs (one $batch round-trip), then list items
+        site_id, drive_id, files = graph.batch_resolve_and_list(folder)
+        target = SharePointTarget(site_id=site_id, drive_id=drive_id)
+        resolution_cache.store(cfg.sharepoint, site_id, drive_id)
     t_retrieval_end = time.perf_counter()
 
     def fmt_dur(seconds: float) -> str:
         m, rem = divmod(seconds, 60.0)
         return f"{int(m):02d}:{rem:06.4f}"
 
-    # Print numbered list of files (skip folders) to help user choose
-    files = []
+    # Print numbered list of files (folders already skipped) to help user choose
     print("Files:")
-    for it in items:
-        if "folder" in it:
-            continue
-        files.append(it)
     for idx, it in enumerate(files, start=1):
         name = it.get("name")
         size = it.get("size")
@@ -101,7 +115,17 @@ def main(config_path: Optional[str] = None) -> int:
 
     print(f"Downloading '{filename}' to '{dest}'...")
     t_dl_start = time.perf_counter()
-    graph.download_item(target, selected.get("id"), dest)
+    streamed_text: Optional[str] = None
+    if os.path.splitext(dest)[1].lower() in TEXT_EXTENSIONS:
+        # Plain text: decode on this thread while the download writes through a pipe.
+        pipe_r, pipe_w = os.pipe()
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            dl_future = ex.submit(graph.download_item_to_pipe, target, selected.get("id"), dest, pipe_w)
+            with os.fdopen(pipe_r, "rb") as reader:
+                streamed_text = read_text_from_stream(reader)
+            dl_future.result()
+    else:
+        graph.download_item_parallel(target, selected.get("id"), dest, size=selected.get("size"))
     t_dl_end = time.perf_counter()
     print("Download complete.")
     # Download metrics
@@ -120,22 +144,41 @@ def main(config_path: Optional[str] = None) -> int:
     summary: Optional[str] = None
     summarize_ok = False
     try:
-        text = read_text_from_file(dest)
+        text = streamed_text if streamed_text is not None else read_text_from_file_cached(dest)
         if not text.strip():
             print("Downloaded file appears empty or unreadable for text extraction.")
         else:
-            llm = LLMClient(cfg)
-            # Load prompts: allow overrides in config
-            p = (cfg.prompts or {}).get("summarize", {})
-            system_prompt = p.get("system") if isinstance(p, dict) else None
-            user_prompt = p.get("user") if isinstance(p, dict) else None
-            # --- Summarization timing ---
-            t_sum_start = time.perf_counter()
-            summary = llm.summarize(text, system_prompt=system_prompt, user_prompt=user_prompt)
-            t_sum_end = time.perf_counter()
+            with LLMClient(cfg) as llm:
+                # Load prompts: allow overrides in config
+                p = (cfg.prompts or {}).get("summarize", {})
+                system_prompt = p.get("system") if isinstance(p, dict) else None
+                user_prompt = p.get("user") if isinstance(p, dict) else None
+                # --- Summarization timing ---
+                t_sum_start = time.perf_counter()
+                if cfg.azure_openai.use_batch:
+                    print("Submitting chunk summaries as an Azure OpenAI batch job; this can take a while...")
+                    summary = llm.summarize_batch([text], system_prompt=system_prompt, user_prompt=user_prompt)[0]
+                    print("\n===== SUMMARY (TITLE + MARKDOWN) =====\n")
+                    print(summary)
+                else:
+                    def on_partial(done: int, total: int) -> None:
+                        print(f"Summarized chunk {done}/{total}", flush=True)
+
+                    # Print the final summary as it streams in.
+                    pieces = []
+                    header_printed = False
+                    for piece in llm.iter_summary(text, system_prompt=system_prompt, user_prompt=user_prompt, on_partial=on_partial):
+                        if not header_printed:
+                            print("\n===== SUMMARY (TITLE + MARKDOWN) =====\n")
+                            header_printed = True
+                        print(piece, end="", flush=True)
+                        pieces.append(piece)
+                    summary = "".join(pieces)
+                    if not header_printed:
+                        print("\n===== SUMMARY (TITLE + MARKDOWN) =====\n")
+                    print()
+                t_sum_end = time.perf_counter()
             summarize_ok = True
-            print("\n===== SUMMARY (TITLE + MARKDOWN) =====\n")
-            print(summary)
             print("\n======================================\n")
             sum_duration = t_sum_end - t_sum_start
             print(f"AI Summarization Time: {fmt_dur(sum_duration)} | Input Chars: {len(text)} | Output Chars: {len(summary or '')}")
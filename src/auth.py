@@ -8,14 +8,19 @@ Design notes:
  - We deliberately use the client credentials (application) flow; interactive delegated flows are
    out of scope for this sample.
  - A minimal abstraction keeps the rest of the code decoupled from MSAL specifics.
- - Token caching (acquire_token_silent) can be introduced later if multiple calls are made; for a
-   single-run summarization we keep it simple.
+ - Tokens are cached on disk (MSAL SerializableTokenCache under CACHE_DIR) so consecutive runs
+   within the token lifetime (~60 minutes) skip the round-trip to the login endpoint. The cache
+   file holds a live access token and is written owner-only (0600).
 """
 
 from typing import Dict
+import os
 import msal
 
-from .config import AppConfig
+from .cache_io import atomic_write_text
+from .config import AppConfig, CACHE_DIR
+
+TOKEN_CACHE_PATH = os.path.join(CACHE_DIR, "msal_cache.bin")
 
 
 class GraphAuth:
@@ -25,23 +30,40 @@ class GraphAuth:
         self.cfg = cfg
         # Authority = login host + tenant id (could be a tenant GUID or domain)
         self.authority = f"{cfg.graph.authority_host}/{cfg.tenant_id}"
+        # Persistent token cache: reuse a still-valid token from a previous run.
+        self.cache = msal.SerializableTokenCache()
+        try:
+            with open(TOKEN_CACHE_PATH, "r", encoding="utf-8") as f:
+                self.cache.deserialize(f.read())
+        except (OSError, ValueError):
+            pass  # missing or unreadable cache: start empty
         # Build a confidential client (uses client secret). For production consider managed identities
         # or certificate credentials for improved security posture.
         self.app = msal.ConfidentialClientApplication(
             client_id=cfg.client_id,
             client_credential=self.cfg.client_secret,
             authority=self.authority,
+            token_cache=self.cache,
         )
 
+    def _save_cache(self) -> None:
+        """Atomically persist the token cache (owner read/write only) if it changed."""
+        if not self.cache.has_state_changed:
+            return
+        try:
+            atomic_write_text(TOKEN_CACHE_PATH, self.cache.serialize())  # owner-only (0600)
+        except OSError:
+            pass  # caching is an optimization; never fail authentication over it
+
     def get_token(self) -> str:
         """Return a bearer token string for Microsoft Graph.
 
         Raises:
             RuntimeError: if token acquisition fails.
         """
-        # We directly call acquire_token_for_client (no account context). If you add caching, pass a
-        # token cache to the ConfidentialClientApplication or call acquire_token_silent first.
+        # acquire_token_for_client serves a still-valid token from the (persisted) cache itself.
         result: Dict = self.app.acquire_token_for_client(scopes=self.cfg.graph.scope)
+        self._save_cache()
         if "access_token" not in result:
             raise RuntimeError(
                 f"Failed to acquire token: {result.get('error')}: {result.get('error_description')}"
@@ -21,6 +21,16 @@ import requests
 
 from .config import AppConfig
 
+try:
+    import orjson  # Optional: faster serialization of the JSON Patch body
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+# Patterns for the TITLE/---/body contract, compiled once at import.
+_TITLE_RE = re.compile(r'^TITLE:\s*(.+)$', re.MULTILINE)
+_SEP_RE = re.compile(r'^---\s*$', re.MULTILINE)
+_TITLE_STRIP_RE = re.compile(r'^TITLE:.*$', re.MULTILINE)
+
 
 class AzureDevOpsClient:
     """Minimal Azure DevOps Work Item client (User Story creation)."""
@@ -37,27 +47,23 @@ class AzureDevOpsClient:
         self.work_item_type = cfg.azure_devops.work_item_type or "User Story"
         self.area_path = cfg.azure_devops.area_path
         self.iteration_path = cfg.azure_devops.iteration_path
-
-    def _auth_header(self) -> dict:
-        """Return Authorization header using basic auth with PAT (username blank)."""
-        token = f":{self.pat}".encode()
-        b64 = base64.b64encode(token).decode()
-        return {"Authorization": f"Basic {b64}"}
+        # Authorization header: basic auth with PAT (username blank), encoded once per client.
+        self._auth = {"Authorization": f"Basic {base64.b64encode(f':{self.pat}'.encode()).decode()}"}
 
     @staticmethod
     def parse_title_and_body(summary_output: str) -> Tuple[str, str]:
         """Extract TITLE: line and markdown body separated by --- as per prompt contract."""
-        title_match = re.search(r'^TITLE:\s*(.+)$', summary_output, re.MULTILINE)
+        title_match = _TITLE_RE.search(summary_output)
         title = title_match.group(1).strip() if title_match else "Generated User Story"
         # Split on first --- line
-        parts = re.split(r'^---\s*$', summary_output, flags=re.MULTILINE)
+        parts = _SEP_RE.split(summary_output)
         if len(parts) >= 2:
             # parts[0] contains title line maybe, body in parts[1] or beyond
             body_candidates = parts[1:]
             body = '\n\n'.join(p.strip() for p in body_candidates if p.strip())
         else:
             # Fallback: remove TITLE line
-            body = re.sub(r'^TITLE:.*$', '', summary_output, flags=re.MULTILINE).strip()
+            body = _TITLE_STRIP_RE.sub('', summary_output).strip()
         return title, body
 
     def create_user_story(self, summary_output: str) -> Tuple[int, Optional[str]]:
@@ -80,10 +86,11 @@ class AzureDevOpsClient:
             ops.append({"op": "add", "path": "/fields/System.IterationPath", "value": self.iteration_path})
 
         headers = {
-            **self._auth_header(),
+            **self._auth,
             'Content-Type': 'application/json-patch+json'
         }
-        resp = requests.post(url, headers=headers, data=json.dumps(ops))
+        body = orjson.dumps(ops) if orjson is not None else json.dumps(ops).encode("utf-8")
+        resp = requests.post(url, headers=headers, data=body)
         if resp.status_code >= 300:
             return resp.status_code, f"Error creating work item: {resp.status_code} {resp.text}"
         data = resp.json()
@@ -0,0 +1,25 @@
+"""Small file helpers shared by the on-disk caches under ``CACHE_DIR``."""
+
+import os
+import tempfile
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    """Write ``text`` to ``path`` atomically (temp file in the same directory + rename).
+
+    The temp file is created by ``mkstemp`` and therefore readable/writable by the owner only;
+    the final file keeps those permissions. Parent directories are created as needed.
+
+    Raises:
+        OSError: if the directory or file cannot be written.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
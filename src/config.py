@@ -16,6 +16,8 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional
 
 CONFIG_FILENAME = os.environ.get("GRAPH_APP_CONFIG", "config.json")
+# Root directory for on-disk caches kept between runs (override via GRAPH_APP_CACHE_DIR).
+CACHE_DIR = os.environ.get("GRAPH_APP_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "graph_app"))
 
 @dataclass
 class GraphSettings:
@@ -36,9 +38,37 @@ class AzureOpenAISettings:
     api_key: str
     deployment: str
     api_version: str
+    # Chunk budget when tiktoken is unavailable (characters)
     max_chars_per_chunk: int = 12000
-    # Optional: number of parallel workers when summarizing chunks (>1 enables concurrency)
+    # Chunk budget when tiktoken is installed (tokens)
+    max_tokens_per_chunk: int = 3000
+    # Characters of the previous chunk repeated at the start of the next one (0 disables)
+    chunk_overlap: int = 200
+    # Text shorter than this (characters) is returned as its own summary without calling the model
+    min_llm_chars: int = 400
+    # Completion budgets: per-chunk summary, and cap for the final output (synthesis or single chunk)
+    max_tokens_chunk: int = 300
+    max_tokens_synthesis: int = 800
+    # Optional: max chunk summarization requests in flight at once (>1 enables concurrency)
     chunk_workers: int = 1
+    # Optional: deployment quota (tokens / requests per minute) to pace real-time calls under (0 = unpaced)
+    tpm_limit: int = 0
+    rpm_limit: int = 0
+    # Attempts per chat call (incl. the first) on throttling/transient errors, and the backoff cap
+    retry_attempts: int = 5
+    retry_max_wait_seconds: int = 30
+    # Optional: JSONL file recording completed chunk summaries, reused when a run is repeated
+    checkpoint_path: str = ""
+    # Optional: summarize chunks through the Batch API. batch_deployment names the Global-Batch
+    # deployment for the chunk requests; `deployment` still serves synthesis and real-time fallback.
+    use_batch: bool = False
+    batch_deployment: str = ""
+    batch_poll_seconds: int = 30
+    # Seconds to wait for a batch job before cancelling it and finishing in real time (0 = no limit)
+    batch_sla_seconds: int = 0
+    # Response cache: 'memory' (per run), 'disk' (under CACHE_DIR, across runs) or 'none'
+    cache_backend: str = "memory"
+    cache_ttl_seconds: int = 86400
 
 @dataclass
 class AzureDevOpsSettings:
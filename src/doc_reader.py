@@ -2,15 +2,98 @@
 
 Currently supported:
  - Plain text-like formats (.txt, .md, .csv, .log)
- - PDF (via pdfminer.six)
- - DOCX (via python-docx)
+ - PDF (via PyMuPDF, falling back to pdfminer.six)
+ - DOCX (streamed from word/document.xml via lxml)
 
 If a required library is missing the caller receives a clear RuntimeError instructing them to
 add the needed dependency to requirements.txt.
 """
 
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Tuple
+import codecs
+import io
 import os
+import zipfile
+
+# Extensions read directly as text (no parser involved).
+TEXT_EXTENSIONS = (".txt", ".md", ".csv", ".log")
+# WordprocessingML namespace and the element tags read from document.xml.
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_P, _W_R, _W_T, _W_TAB, _W_BR, _W_CR = (_W + t for t in ("p", "r", "t", "tab", "br", "cr"))
+_W_TXBX = _W + "txbxContent"
+# PDFs with more pages than this are extracted across a process pool; below it the process
+# start-up cost outweighs the gain.
+PARALLEL_PDF_MIN_PAGES = 30
+# Contiguous pages handed to each worker task (one document open per task, not per page).
+PAGES_PER_TASK = 8
+# Bytes decoded per step by read_text_from_stream.
+STREAM_BLOCK_SIZE = 256 * 1024
+
+
+def _extract_pages(args: Tuple[str, int, int]) -> str:
+    """Process-pool worker: return the text of pages [start, stop) of a PDF."""
+    import pymupdf  # type: ignore
+
+    path, start, stop = args
+    with pymupdf.open(path) as doc:
+        return "\n".join(doc[i].get_text("text") for i in range(start, stop))
+
+
+def _read_pdf(path: str) -> str:
+    """Extract PDF text with PyMuPDF (parallel for large files), falling back to pdfminer.six."""
+    try:
+        import pymupdf  # type: ignore  # PyMuPDF: C-based extractor, much faster than pdfminer
+    except Exception:  # pragma: no cover
+        pymupdf = None
+    if pymupdf is not None:
+        with pymupdf.open(path) as doc:
+            page_count = doc.page_count
+            if page_count <= PARALLEL_PDF_MIN_PAGES:
+                return "\n".join(page.get_text("text") for page in doc)
+        # Each worker re-opens the file (cheap) and decodes its own page range in parallel.
+        tasks = [(path, i, min(i + PAGES_PER_TASK, page_count)) for i in range(0, page_count, PAGES_PER_TASK)]
+        with ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as ex:
+            return "\n".join(ex.map(_extract_pages, tasks))
+    try:
+        import pdfminer.high_level  # type: ignore
+    except Exception as e:  # pragma: no cover
+        raise RuntimeError(
+            "PyMuPDF or pdfminer.six is required to read PDFs. Add 'PyMuPDF' to requirements.txt"
+        ) from e
+    return pdfminer.high_level.extract_text(path) or ""
+
+
+def _read_docx(path: str) -> str:
+    """Stream paragraph text out of a .docx without building a document object model.
+
+    ``word/document.xml`` is parsed incrementally; each paragraph is converted to text and then
+    cleared (together with already-processed siblings) so memory stays flat on large files.
+    Table cell paragraphs are included, in document order. Text-box paragraphs are skipped, as
+    python-docx did: Word stores each text box twice (the DrawingML shape and its VML fallback),
+    both under ``w:txbxContent``.
+    """
+    try:
+        from lxml import etree  # type: ignore
+    except Exception as e:  # pragma: no cover
+        raise RuntimeError(
+            "lxml is required to read .docx files. Add 'lxml' to requirements.txt"
+        ) from e
+    paragraphs = []
+    with zipfile.ZipFile(path) as z, z.open("word/document.xml") as f:
+        for _, el in etree.iterparse(f, events=("end",), tag=_W_P):
+            if next(el.iterancestors(_W_TXBX), None) is None:
+                parts = []
+                for node in el.iter(_W_T, _W_TAB, _W_BR, _W_CR):
+                    if node.tag == _W_T:
+                        parts.append(node.text or "")
+                    elif node.getparent().tag == _W_R:  # skip tab-stop definitions in paragraph props
+                        parts.append("\t" if node.tag == _W_TAB else "\n")
+                paragraphs.append("".join(parts))
+            el.clear()
+            while el.getprevious() is not None:
+                del el.getparent()[0]
+    return "\n".join(paragraphs)
 
 
 def read_text_from_file(path: str) -> str:
@@ -18,7 +101,8 @@ def read_text_from_file(path: str) -> str:
 
     Strategy:
         - Choose fast direct read for plain-text extensions.
-        - For PDF and DOCX leverage specialized parsers.
+        - For PDF and DOCX leverage specialized parsers (PyMuPDF preferred for PDF, with large
+          PDFs split into page ranges across a process pool).
         - Fallback: attempt a generic UTF-8 decode with replacement.
 
     Args:
@@ -29,26 +113,30 @@ def read_text_from_file(path: str) -> str:
         RuntimeError: when an optional dependency is missing for a given format.
     """
     ext = os.path.splitext(path)[1].lower()
-    if ext in (".txt", ".md", ".csv", ".log"):
+    if ext in TEXT_EXTENSIONS:
         with open(path, "r", encoding="utf-8", errors="ignore") as f:
             return f.read()
     if ext == ".pdf":
-        try:
-            import pdfminer.high_level  # type: ignore
-        except Exception as e:  # pragma: no cover
-            raise RuntimeError(
-                "pdfminer.six is required to read PDFs. Add 'pdfminer.six' to requirements.txt"
-            ) from e
-        return pdfminer.high_level.extract_text(path) or ""
+        return _read_pdf(path)
     if ext == ".docx":
-        try:
-            import docx  # type: ignore  # python-docx
-        except Exception as e:  # pragma: no cover
-            raise RuntimeError(
-                "python-docx is required to read .docx files. Add 'python-docx' to requirements.txt"
-            ) from e
-        doc = docx.Document(path)
-        return "\n".join(p.text for p in doc.paragraphs)
+        return _read_docx(path)
     # Fallback: treat as text
     with open(path, "r", encoding="utf-8", errors="ignore") as f:
         return f.read()
+
+
+def read_text_from_stream(stream: BinaryIO) -> str:
+    """Decode a plain-text document (see ``TEXT_EXTENSIONS``) from a binary stream.
+
+    Bytes are decoded block by block as they arrive, so when ``stream`` is the read end of a pipe
+    fed by a download the text is ready as soon as the transfer ends and the raw bytes are never
+    held in full. Same decoding rules as ``read_text_from_file`` (UTF-8, undecodable bytes
+    ignored, universal newlines); multi-byte characters and ``\r\n`` split across blocks are
+    handled by the incremental decoders.
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(errors="ignore"), translate=True)
+    # read1 returns whatever is available (one underlying read) instead of waiting for a full block.
+    read = getattr(stream, "read1", stream.read)
+    parts = [decoder.decode(block) for block in iter(lambda: read(STREAM_BLOCK_SIZE), b"")]
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
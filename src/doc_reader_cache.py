@@ -0,0 +1,71 @@
+"""On-disk cache for extracted document text.
+
+Parsing a PDF or DOCX is the slowest local step of a run, and the same document is often picked
+again (demos, prompt iteration). Extracted text is stored under ``CACHE_DIR/doc_text`` keyed by
+the SHA-256 of the file bytes plus its extension, so a re-download of unchanged content is a
+cache hit even though the local file (and its mtime) is new.
+
+The cache is bounded: after each write the least recently used entries (by mtime, refreshed on
+every hit) are evicted until the total size is under ``MAX_CACHE_BYTES``. Cache I/O failures are
+never fatal; extraction simply runs uncached.
+"""
+
+import hashlib
+import os
+
+from .cache_io import atomic_write_text
+from .config import CACHE_DIR
+from .doc_reader import TEXT_EXTENSIONS, read_text_from_file
+
+DOC_TEXT_CACHE_DIR = os.path.join(CACHE_DIR, "doc_text")
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def _file_digest(path: str) -> str:
+    """Return the hex SHA-256 of a file, hashed in 1MB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _evict() -> None:
+    """Remove least recently used entries until the cache fits in MAX_CACHE_BYTES."""
+    entries = []
+    with os.scandir(DOC_TEXT_CACHE_DIR) as it:
+        for e in it:
+            if e.is_file() and e.name.endswith(".txt"):
+                st = e.stat()
+                entries.append((st.st_mtime, st.st_size, e.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= MAX_CACHE_BYTES:
+            break
+        os.remove(path)
+        total -= size
+
+
+def read_text_from_file_cached(path: str) -> str:
+    """Cached variant of ``read_text_from_file`` (same arguments, return value and errors).
+
+    Plain-text formats bypass the cache: reading them is as cheap as hashing them.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in TEXT_EXTENSIONS:
+        return read_text_from_file(path)
+    cache_path = os.path.join(DOC_TEXT_CACHE_DIR, f"{_file_digest(path)}{ext}.txt")
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        os.utime(cache_path)  # refresh recency for LRU eviction
+        return text
+    except OSError:
+        pass
+    text = read_text_from_file(path)
+    try:
+        atomic_write_text(cache_path, text)
+        _evict()
+    except OSError:
+        pass
+    return text
@@ -3,19 +3,79 @@
 Responsibilities:
  - Resolve a SharePoint site (given host + path) to its site ID.
  - Resolve a document library (drive) by name to its drive ID.
- - Enumerate items (files/folders) optionally within a sub-folder path.
- - Download a selected file to local disk (streaming, memory-efficient).
+ - Combine site + drive resolution into a single JSON $batch round-trip.
+ - Enumerate items (files/folders) optionally within a sub-folder path, or stream just the files.
+ - Download a selected file to local disk (streaming, memory-efficient), optionally as parallel
+   byte ranges for large files or teed into a pipe for concurrent processing.
 
 Why a thin wrapper? To isolate raw REST calls and provide clear error messages; callers do not
 need to assemble Graph endpoints manually.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+import os
+import shutil
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 import requests
 
 from .config import AppConfig
 
+try:
+    import ijson  # Optional: incremental JSON parsing of large listings
+except Exception:  # pragma: no cover
+    ijson = None  # type: ignore
+
+try:
+    import orjson  # Optional: faster JSON decoding of Graph responses
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+# Item fields kept by iter_items (everything the console listing and download step use).
+ITEM_FIELDS = ("id", "name", "size", "lastModifiedDateTime", "file")
+# Children query: largest page Graph allows plus only the fields we read ("folder" to filter).
+CHILDREN_QUERY = "$top=999&$select=" + ",".join(ITEM_FIELDS + ("folder",))
+# Drives query: only what _match_drive reads. (List drives does not support $filter, so the
+# name match stays client-side; $select keeps the payload to two small fields per library.)
+DRIVES_QUERY = "$select=id,name"
+# Read size used when copying download streams to disk.
+DOWNLOAD_BUFFER_SIZE = 4 * 1024 * 1024
+# Connections kept per host (Graph + the SharePoint download host) and per-request timeout.
+POOL_MAXSIZE = 50
+REQUEST_TIMEOUT = 30.0
+# Block size when teeing a download into a pipe (small enough for the reader to keep pace).
+PIPE_BLOCK_SIZE = 256 * 1024
+# Files smaller than this are downloaded as a single stream (range setup is not worth it).
+PARALLEL_DOWNLOAD_MIN_SIZE = 16 * 1024 * 1024
+
+
+def _iter_page_items(raw: Any, next_link: List[str]) -> Iterator[Dict[str, Any]]:
+    """Incrementally parse one Graph collection page, yielding each ``value`` entry.
+
+    ``@odata.nextLink`` may appear before or after ``value`` in the payload, so it is captured
+    into ``next_link`` (a one-element out list) while the items stream past.
+    """
+    builder = None
+    for prefix, event, value in ijson.parse(raw):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == "value.item" and event == "end_map":
+                yield builder.value
+                builder = None
+        elif prefix == "value.item" and event == "start_map":
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+        elif prefix == "@odata.nextLink":
+            next_link.append(value)
+
+
+class GraphRequestError(RuntimeError):
+    """A Graph call returned a non-success status (kept as RuntimeError for existing callers)."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
 
 @dataclass
 class SharePointTarget:
@@ -27,22 +87,68 @@ class SharePointTarget:
 class GraphClient:
     """High-level helper for a subset of Graph endpoints used in this sample."""
 
-    def __init__(self, cfg: AppConfig, access_token: str):
+    def __init__(self, cfg: AppConfig, access_token: Optional[str] = None):
         self.cfg = cfg
         self.base = cfg.graph.base_url.rstrip("/")
-        # Reuse an HTTP session across requests for connection pooling.
+        # Reuse an HTTP session across requests for connection pooling. The default adapter keeps
+        # at most 10 connections per host; parallel range downloads and pagination need more.
         self.session = requests.Session()
-        self.session.headers.update({
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/json"
-        })
+        adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+        if access_token:
+            self.set_token(access_token)
+
+    def set_token(self, access_token: str) -> None:
+        """Attach (or replace) the bearer token used for subsequent Graph calls."""
+        self.session.headers["Authorization"] = f"Bearer {access_token}"
+
+    def warmup(self) -> None:
+        """Open a pooled TCP/TLS connection to the Graph host ahead of the first real call.
+
+        Intended to run while the access token is still being acquired: the unauthenticated HEAD
+        is expected to be rejected, but the DNS lookup and TLS handshake are already paid for when
+        the first authenticated request reuses the connection. Failures are ignored.
+        """
+        try:
+            self.session.head(self.base, timeout=10)
+        except requests.RequestException:
+            pass
 
     def _get(self, url: str, **kwargs) -> Dict[str, Any]:
         """Perform a GET request and raise a descriptive error on failure."""
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
         r = self.session.get(url, **kwargs)
         if not r.ok:
-            raise RuntimeError(f"Graph GET failed {r.status_code}: {r.text}")
-        return r.json()
+            raise GraphRequestError(f"Graph GET failed {r.status_code}: {r.text}", r.status_code)
+        return orjson.loads(r.content) if orjson is not None else r.json()
+
+    def _batch(self, requests_: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """POST a JSON $batch and return each response body keyed by request id.
+
+        Raises:
+            RuntimeError: if the batch itself fails or any individual step is unsuccessful.
+        """
+        r = self.session.post(f"{self.base}/$batch", json={"requests": requests_}, timeout=REQUEST_TIMEOUT)
+        if not r.ok:
+            raise RuntimeError(f"Graph $batch failed {r.status_code}: {r.text}")
+        bodies: Dict[str, Dict[str, Any]] = {}
+        data = orjson.loads(r.content) if orjson is not None else r.json()
+        for resp in data.get("responses", []):
+            status = resp.get("status", 0)
+            if status >= 300:
+                raise RuntimeError(f"Graph $batch step {resp.get('id')} failed {status}: {resp.get('body')}")
+            bodies[resp["id"]] = resp.get("body") or {}
+        return bodies
+
+    def _match_drive(self, drives: List[Dict[str, Any]], site_id: str) -> str:
+        """Pick the drive whose name matches the configured drive_name."""
+        drive_name = self.cfg.sharepoint.drive_name
+        for d in drives:
+            if d.get("name") == drive_name:
+                return d.get("id")
+        raise RuntimeError(f"Drive named '{drive_name}' not found on site {site_id}")
 
     def resolve_site(self) -> str:
         """Return the site ID for the configured SharePoint site path."""
@@ -54,14 +160,33 @@ class GraphClient:
 
     def resolve_drive(self, site_id: str) -> str:
         """Return the drive (document library) ID matching the configured drive_name."""
-        drive_name = self.cfg.sharepoint.drive_name
-        url = f"{self.base}/sites/{site_id}/drives"
+        url = f"{self.base}/sites/{site_id}/drives?{DRIVES_QUERY}"
         data = self._get(url)
-        drives = data.get("value", [])
-        for d in drives:
-            if d.get("name") == drive_name:
-                return d.get("id")
-        raise RuntimeError(f"Drive named '{drive_name}' not found on site {site_id}")
+        return self._match_drive(data.get("value", []), site_id)
+
+    def batch_resolve_and_list(self, folder_path: Optional[str] = None) -> Tuple[str, str, List[Dict[str, Any]]]:
+        """Resolve site + drive in one $batch round-trip, then list the files.
+
+        $batch cannot feed one step's response into another step's URL, so the drive listing is
+        addressed through the site path (``/sites/{host}:{path}:/drives``) instead of the site ID.
+        That makes both lookups independent and lets them share a single request; only the item
+        listing (which needs the drive ID) is a second round-trip: 2 RTTs instead of 3.
+
+        Args:
+            folder_path: Optional relative folder inside the drive (see ``list_items``).
+        Returns:
+            (site_id, drive_id, files) where files come from ``iter_items`` (folders excluded).
+        """
+        host = self.cfg.sharepoint.site_hostname
+        spath = self.cfg.sharepoint.site_path
+        bodies = self._batch([
+            {"id": "1", "method": "GET", "url": f"/sites/{host}:{spath}?$select=id"},
+            {"id": "2", "method": "GET", "url": f"/sites/{host}:{spath}:/drives?{DRIVES_QUERY}"},
+        ])
+        site_id = bodies["1"]["id"]
+        drive_id = self._match_drive(bodies["2"].get("value", []), site_id)
+        files = list(self.iter_items(SharePointTarget(site_id=site_id, drive_id=drive_id), folder_path))
+        return site_id, drive_id, files
 
     def list_items(self, target: SharePointTarget, folder_path: Optional[str] = None) -> List[Dict[str, Any]]:
         """List items (files/folders) in the root or a nested folder.
@@ -70,15 +195,49 @@ class GraphClient:
             target: Resolved site + drive identifiers.
             folder_path: Optional relative folder (e.g. "Folder/Sub") inside the drive.
         Returns:
-            A list of item objects from Graph (raw JSON dictionaries).
+            A list of item objects from Graph (raw JSON dictionaries), across all result pages.
+        """
+        items: List[Dict[str, Any]] = []
+        url: Optional[str] = self._children_url(target, folder_path)
+        while url:
+            data = self._get(url)
+            items.extend(data.get("value", []))
+            url = data.get("@odata.nextLink")
+        return items
+
+    def iter_items(self, target: SharePointTarget, folder_path: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield only the files (folders skipped) in the root or a nested folder.
+
+        When ``ijson`` is installed the response is parsed incrementally from the socket, so the
+        full JSON document is never buffered or materialized; otherwise it falls back to
+        ``list_items``. Each yielded dict is projected down to ``ITEM_FIELDS``. Result pages are
+        followed via ``@odata.nextLink``; next links are opaque, so pages are fetched one after
+        another over the same pooled connection.
         """
+        if ijson is None:
+            for it in self.list_items(target, folder_path):
+                if "folder" not in it:
+                    yield {k: it[k] for k in ITEM_FIELDS if k in it}
+            return
+        url: Optional[str] = self._children_url(target, folder_path)
+        while url:
+            next_link: List[str] = []
+            with self.session.get(url, stream=True, timeout=REQUEST_TIMEOUT) as r:
+                if not r.ok:
+                    raise GraphRequestError(f"Graph GET failed {r.status_code}: {r.text}", r.status_code)
+                r.raw.decode_content = True  # transparently gunzip before parsing
+                for it in _iter_page_items(r.raw, next_link):
+                    if "folder" not in it:
+                        yield {k: it[k] for k in ITEM_FIELDS if k in it}
+            url = next_link[0] if next_link else None
+
+    def _children_url(self, target: SharePointTarget, folder_path: Optional[str] = None) -> str:
+        """Build the children endpoint for the drive root or a nested folder."""
         if folder_path:
             # Encode each segment to handle spaces/special characters.
             enc_path = "/".join([requests.utils.quote(p, safe="") for p in folder_path.strip("/").split("/")])
-            url = f"{self.base}/drives/{target.drive_id}/root:/{enc_path}:/children"
-        else:
-            url = f"{self.base}/drives/{target.drive_id}/root/children"
-        return self._get(url).get("value", [])
+            return f"{self.base}/drives/{target.drive_id}/root:/{enc_path}:/children?{CHILDREN_QUERY}"
+        return f"{self.base}/drives/{target.drive_id}/root/children?{CHILDREN_QUERY}"
 
     def download_item(self, target: SharePointTarget, item_id: str, dest_path: str) -> str:
         """Stream a file's binary contents to disk.
@@ -93,11 +252,108 @@ class GraphClient:
             RuntimeError: on non-successful HTTP status codes.
         """
         url = f"{self.base}/drives/{target.drive_id}/items/{item_id}/content"
-        r = self.session.get(url, stream=True)
-        if not r.ok:
-            raise RuntimeError(f"Graph download failed {r.status_code}: {r.text}")
+        with self.session.get(url, stream=True, timeout=REQUEST_TIMEOUT) as r:
+            if not r.ok:
+                raise RuntimeError(f"Graph download failed {r.status_code}: {r.text}")
+            r.raw.decode_content = True  # honour any Content-Encoding before writing to disk
+            with open(dest_path, "wb") as f:
+                # copyfileobj keeps the read/write loop tight; 4MB buffers cut per-chunk overhead.
+                shutil.copyfileobj(r.raw, f, length=DOWNLOAD_BUFFER_SIZE)
+        return dest_path
+
+    def download_item_to_pipe(self, target: SharePointTarget, item_id: str, dest_path: str, pipe_w: int) -> str:
+        """Stream a file to disk while also writing every block into the pipe ``pipe_w``.
+
+        Meant to run on a worker thread while the caller consumes the read end of the pipe (e.g.
+        decoding text), so processing overlaps the transfer instead of following it. ``pipe_w`` is
+        always closed on return, including on errors, so the reader sees EOF.
+
+        Returns:
+            The destination path (for convenience/chaining).
+        Raises:
+            RuntimeError: on non-successful HTTP status codes.
+        """
+        url = f"{self.base}/drives/{target.drive_id}/items/{item_id}/content"
+        with os.fdopen(pipe_w, "wb") as pipe:
+            with self.session.get(url, stream=True, timeout=REQUEST_TIMEOUT) as r:
+                if not r.ok:
+                    raise RuntimeError(f"Graph download failed {r.status_code}: {r.text}")
+                r.raw.decode_content = True
+                with open(dest_path, "wb") as f:
+                    for block in iter(lambda: r.raw.read(PIPE_BLOCK_SIZE), b""):
+                        f.write(block)
+                        pipe.write(block)
+        return dest_path
+
+    def download_item_parallel(
+        self,
+        target: SharePointTarget,
+        item_id: str,
+        dest_path: str,
+        parts: int = 8,
+        size: Optional[int] = None,
+    ) -> str:
+        """Download a file as ``parts`` concurrent HTTP byte ranges written in place.
+
+        The first range is requested up front: if the server answers 206 the remaining ranges are
+        fetched on a thread pool, each writing at its own offset into a pre-sized file; if it
+        answers 200 (ranges unsupported) that response is simply streamed as a full download.
+        Small files go straight to ``download_item``.
+
+        Args:
+            target: Resolved SharePoint identifiers.
+            item_id: Drive item ID (file) to download.
+            dest_path: Local file system path to write to.
+            parts: Number of ranges (and worker threads) to split the file into.
+            size: File size in bytes if already known (e.g. from the listing); fetched otherwise.
+        Returns:
+            The destination path (for convenience/chaining).
+        Raises:
+            RuntimeError: on non-successful HTTP status codes.
+        """
+        if size is None:
+            size = self._get(f"{self.base}/drives/{target.drive_id}/items/{item_id}?$select=size").get("size", 0)
+        if parts <= 1 or size < PARALLEL_DOWNLOAD_MIN_SIZE:
+            return self.download_item(target, item_id, dest_path)
+
+        url = f"{self.base}/drives/{target.drive_id}/items/{item_id}/content"
+        part_size = -(-size // parts)  # ceil division
+        ranges = [(lo, min(lo + part_size, size) - 1) for lo in range(0, size, part_size)]
+        first_range = f"bytes={ranges[0][0]}-{ranges[0][1]}"
+        first = self.session.get(url, headers={"Range": first_range}, stream=True, timeout=REQUEST_TIMEOUT)
+        if first.status_code == 200:
+            with open(dest_path, "wb"):
+                pass
+            self._write_at(first, dest_path, 0)
+            return dest_path
+        if first.status_code != 206:
+            first.close()
+            raise RuntimeError(f"Graph download failed {first.status_code}: {first.text}")
+
+        # Pre-size the file so every worker can seek to its offset and write independently.
         with open(dest_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=1024 * 1024):  # 1MB chunks balances speed/memory
-                if chunk:
-                    f.write(chunk)
+            f.truncate(size)
+        with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="graph-range") as ex:
+            futures = [ex.submit(self._write_at, first, dest_path, 0)]
+            futures += [ex.submit(self._download_range, url, dest_path, lo, hi) for lo, hi in ranges[1:]]
+            for fut in futures:
+                fut.result()
         return dest_path
+
+    def _download_range(self, url: str, dest_path: str, lo: int, hi: int) -> None:
+        """Fetch bytes ``lo..hi`` (inclusive) and write them at offset ``lo``."""
+        r = self.session.get(url, headers={"Range": f"bytes={lo}-{hi}"}, stream=True, timeout=REQUEST_TIMEOUT)
+        if r.status_code != 206:
+            r.close()
+            raise RuntimeError(f"Graph range download failed {r.status_code} for bytes {lo}-{hi}")
+        self._write_at(r, dest_path, lo)
+
+    @staticmethod
+    def _write_at(r: requests.Response, dest_path: str, offset: int) -> None:
+        """Copy a streaming response body into ``dest_path`` starting at ``offset``."""
+        with r:
+            r.raw.decode_content = True
+            # A private handle per writer keeps seek + write free of cross-thread races.
+            with open(dest_path, "r+b") as f:
+                f.seek(offset)
+                shutil.copyfileobj(r.raw, f, length=DOWNLOAD_BUFFER_SIZE)
@@ -0,0 +1,146 @@
+"""Exact-match cache for chat completion responses.
+
+Keys are a BLAKE2b digest of everything that determines the model output (deployment, sampling
+settings and the message list), so a hit is only ever returned for an equivalent request. Chunk
+requests are keyed on the chunk text and prompts without their "Chunk i/N" position label (see
+``LLMClient._chunk_key``), so repeated chunks (shared boilerplate across documents, or the same
+document summarized again) hit wherever they occur.
+
+Backends:
+ - ``memory``: per-process dict (default). Helps within a run.
+ - ``disk``: JSON entries under ``CACHE_DIR/llm`` that survive between runs. Entries contain
+   model output derived from document content; use only where that is acceptable.
+ - ``none``: caching disabled.
+Entries expire after ``ttl_seconds``. The disk backend deletes expired entries when it finds them
+and, on its first write in a process, prunes expired entries and then the oldest ones until the
+directory is under ``MAX_DISK_CACHE_BYTES``.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .cache_io import atomic_write_text
+from .config import CACHE_DIR
+
+LLM_CACHE_DIR = os.path.join(CACHE_DIR, "llm")
+CACHE_BACKENDS = ("memory", "disk", "none")
+MAX_DISK_CACHE_BYTES = 16 * 1024 * 1024
+
+
+def make_key(deployment: str, max_tokens: int, temperature: float, messages: List[dict]) -> str:
+    """Return the cache key for a chat completion request."""
+    payload = json.dumps([deployment, max_tokens, temperature, messages], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """TTL-bounded response cache with a memory or disk backend."""
+
+    def __init__(self, backend: str = "memory", ttl_seconds: int = 86400):
+        if backend not in CACHE_BACKENDS:
+            raise ValueError(f"Unknown cache_backend '{backend}'; expected one of {', '.join(CACHE_BACKENDS)}")
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._memory: Dict[str, Tuple[float, str]] = {}
+        self._pruned = False
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` if present and not expired."""
+        if self.backend == "memory":
+            entry = self._memory.get(key)
+            if entry and entry[0] > time.time():
+                return entry[1]
+            self._memory.pop(key, None)
+            return None
+        if self.backend == "disk":
+            path = os.path.join(LLM_CACHE_DIR, f"{key}.json")
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                if entry.get("expires", 0) > time.time():
+                    return entry.get("text")
+                os.remove(path)
+            except (OSError, ValueError):
+                pass
+        return None
+
+    def set(self, key: str, text: str) -> None:
+        """Store a response for ``key`` for ``ttl_seconds``."""
+        expires = time.time() + self.ttl_seconds
+        if self.backend == "memory":
+            self._memory[key] = (expires, text)
+        elif self.backend == "disk":
+            try:
+                atomic_write_text(
+                    os.path.join(LLM_CACHE_DIR, f"{key}.json"), json.dumps({"expires": expires, "text": text})
+                )
+                if not self._pruned:
+                    self._pruned = True
+                    self._prune()
+            except OSError:
+                pass  # caching is an optimization only
+
+    def _prune(self) -> None:
+        """Delete expired disk entries, then the oldest, until under MAX_DISK_CACHE_BYTES.
+
+        Entries are written once and never touched, so mtime is the write time: an entry older
+        than ``ttl_seconds`` has expired without needing to be opened.
+        """
+        cutoff = time.time() - self.ttl_seconds
+        entries = []
+        with os.scandir(LLM_CACHE_DIR) as it:
+            for e in it:
+                if e.is_file() and e.name.endswith(".json"):
+                    st = e.stat()
+                    if st.st_mtime < cutoff:
+                        os.remove(e.path)
+                    else:
+                        entries.append((st.st_mtime, st.st_size, e.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= MAX_DISK_CACHE_BYTES:
+                break
+            os.remove(path)
+            total -= size
+
+
+class ChunkCheckpoint:
+    """Append-only JSONL record of completed chunk summaries, so an interrupted run can resume.
+
+    Each line is ``{"key": <chunk key>, "summary": <text>}``; keys are the same chunk keys as the
+    response cache, so a summary is only reused for the same chunk text, prompts and settings.
+    An empty ``path`` disables checkpointing.
+    """
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self._done: Dict[str, str] = {}
+        if not path:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._done[entry["key"]] = entry["summary"]
+                    except (ValueError, KeyError, TypeError):
+                        continue  # e.g. a line cut short by a crash
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[str]:
+        return self._done.get(key)
+
+    def add(self, key: str, summary: str) -> None:
+        """Record a completed chunk (written through immediately)."""
+        if not self.path or key in self._done:
+            return
+        self._done[key] = summary
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "summary": summary}, ensure_ascii=False) + "\n")
+        except OSError:
+            pass  # checkpointing is best-effort
@@ -1,158 +1,943 @@
 """LLM client abstraction using Semantic Kernel for Azure OpenAI Chat Completions.
 
 Features:
- - Automatic chunking of large documents to respect model context limits (char-count heuristic).
- - Optional parallel summarization of chunks (ThreadPoolExecutor) for throughput.
- - Two-phase summarization: per-chunk + synthesis step for cohesive final result.
+ - Automatic chunking of large documents to respect model context limits: token-counted (tiktoken)
+   when available, character-counted otherwise, split recursively along Markdown headings,
+   paragraphs, lines, sentences and words, with a configurable overlap between chunks.
+ - Concurrent async summarization of chunks (bounded by chunk_workers and optionally paced under
+   the deployment's TPM/RPM quota), with the synthesis step streamed so callers can render the
+   final summary as it is generated.
+ - Two-phase summarization: per-chunk + synthesis step for cohesive final result; partials too
+   large for one synthesis request are merged hierarchically first.
+ - Optional Azure OpenAI Batch API path for the chunk phase (cheaper, non-interactive).
  - Prompt override support via configuration (system + user prompts).
+ - Cache-friendly message layout: identical system/instruction prefix, variable content last.
+ - Duplicate chunks (same text up to whitespace) are summarized once per document.
+ - Exact-match response cache (memory or disk) keyed per request, so repeated chunks are free.
+ - Retries with jittered exponential backoff on throttling/transient errors, and an optional
+   checkpoint file of completed chunk summaries so an interrupted run resumes where it stopped.
 
 Extension guidance for customers:
  - To emit structured data (e.g., JSON with title/body) instruct the model via the user prompt.
  - If you need token-level control consider switching to the Responses API once available.
- - For very large documents consider semantic chunking (headings) as an enhancement.
+ - For very large documents consider embedding-based semantic chunking as an enhancement.
 """
 
-from typing import List, Optional, Tuple
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Coroutine, Iterator, List, Optional, Tuple, TypeVar
+import concurrent.futures
+import functools
+import hashlib
+import json
 import os
+import queue
+import re
+import threading
+import time
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import bisect
 
 from .config import AppConfig
+from .llm_cache import ChunkCheckpoint, ResponseCache, make_key
+from .rate_limit import RateLimiter, estimate_tokens
+from .retry import is_retryable, retry_delay
+
+# Semantic Kernel symbols, imported on first chat call (see _sk) so that importing this module or
+# constructing a client stays cheap for runs that never summarize.
+_SK: Optional[SimpleNamespace] = None
 
 try:
-    from semantic_kernel import Kernel
-    from semantic_kernel.connectors.ai.open_ai.services.azure_chat_completion import AzureChatCompletion
-    from semantic_kernel.connectors.ai.open_ai.prompt_execution_settings.azure_chat_prompt_execution_settings import AzureChatPromptExecutionSettings
-    from semantic_kernel.contents import ChatHistory
+    from openai import AsyncAzureOpenAI, OpenAIError  # Batch API (files + batches); not exposed by Semantic Kernel
 except Exception:  # pragma: no cover
-    Kernel = None  # type: ignore
-    AzureChatCompletion = None  # type: ignore
-    AzureChatPromptExecutionSettings = None  # type: ignore
-    ChatHistory = None  # type: ignore
+    AsyncAzureOpenAI = None  # type: ignore
+    OpenAIError = None  # type: ignore
+
+T = TypeVar("T")
+
+# Sampling temperature of every summarization request; part of the response cache key, so the
+# requests and the keys they are cached under must agree.
+TEMPERATURE = 0.2
+
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant that writes concise, accurate summaries."
+DEFAULT_USER_PROMPT = "Summarize the following content in 8-12 bullet points with headings and key takeaways."
+SYNTHESIS_PROMPT = "Merge these partial summaries of one document into the output requested above. Keep factual fidelity."
+MERGE_PROMPT = (
+    "Merge these partial summaries of consecutive segments of one document into a single partial summary. "
+    "Keep factual fidelity."
+)
+
+# Separators tried in order when a piece exceeds the chunk budget, coarsest first: Markdown
+# sections (H1/H2, then H3), paragraphs, lines, sentences, words. Heading splits keep the heading
+# with its section.
+_SPLIT_LEVELS = [
+    re.compile(r"\n(?=#{1,2} )"),
+    re.compile(r"\n(?=### )"),
+    re.compile(r"\n\s*\n"),
+    re.compile(r"\n"),
+    re.compile(r"(?<=[.!?])\s+"),
+    re.compile(r"\s+"),
+]
+_WS_RE = re.compile(r"\s")
+_NON_WS_RE = re.compile(r"\S")
+_WS_RUN_RE = re.compile(r"\s+")
+
+
+def _load_encoding(deployment: str) -> Any:
+    """Tokenizer for the deployment's model, or None to fall back to character budgets.
+
+    Deployment names are user-chosen, so one that does not name a known model falls back to the
+    current (o200k) and then previous (cl100k) OpenAI encodings. tiktoken is optional and imported
+    here, on first chunking, since loading an encoding may download its BPE file.
+    """
+    try:
+        import tiktoken  # type: ignore
+    except Exception:
+        return None
+    try:
+        return tiktoken.encoding_for_model(deployment)
+    except KeyError:
+        pass
+    except Exception:
+        return None  # encoding data unavailable (e.g. offline without a tiktoken cache)
+    for name in ("o200k_base", "cl100k_base"):
+        try:
+            return tiktoken.get_encoding(name)
+        except Exception:
+            continue
+    return None
+
+
+def _sk() -> SimpleNamespace:
+    """Import Semantic Kernel on first use.
+
+    Raises:
+        RuntimeError: if the semantic-kernel package is not installed.
+    """
+    global _SK
+    if _SK is None:
+        try:
+            from semantic_kernel import Kernel
+            from semantic_kernel.connectors.ai.open_ai.services.azure_chat_completion import AzureChatCompletion
+            from semantic_kernel.connectors.ai.open_ai.prompt_execution_settings.azure_chat_prompt_execution_settings import AzureChatPromptExecutionSettings
+            from semantic_kernel.contents import ChatHistory
+        except Exception as e:
+            raise RuntimeError(
+                "semantic-kernel package not installed. Please add 'semantic-kernel>=1.35.0' to requirements and install."
+            ) from e
+        _SK = SimpleNamespace(
+            Kernel=Kernel,
+            AzureChatCompletion=AzureChatCompletion,
+            AzureChatPromptExecutionSettings=AzureChatPromptExecutionSettings,
+            ChatHistory=ChatHistory,
+            # Role -> ChatHistory method, replacing a per-message if/elif chain.
+            adders={
+                "system": ChatHistory.add_system_message,
+                "user": ChatHistory.add_user_message,
+                "assistant": ChatHistory.add_assistant_message,
+            },
+        )
+    return _SK
+
+
+@functools.lru_cache(maxsize=16)
+def _settings(max_tokens: int, temperature: float) -> Any:
+    """Execution settings per (max_tokens, temperature), built and validated once."""
+    return _sk().AzureChatPromptExecutionSettings(max_tokens=max_tokens, temperature=temperature)
 
 
 class LLMClient:
-    """Semantic Kernel-based Azure OpenAI Chat Completions client with naive size-based chunking."""
+    """Semantic Kernel-based Azure OpenAI Chat Completions client with token-budgeted chunking.
+
+    The chat service's HTTP client belongs to the event loop it was first used on: the private
+    background loop for the synchronous methods, or the caller's loop for ``summarize_async`` /
+    ``summarize_stream``. Don't share one client across event loops; use one per loop and release
+    it with ``close()`` (synchronous use) or ``await aclose()`` (async use).
+    """
 
     def __init__(self, cfg: AppConfig):
         if not cfg.azure_openai:
             raise ValueError("Azure OpenAI settings missing in config.json (azure_openai)")
-        if Kernel is None or AzureChatCompletion is None:
-            raise RuntimeError(
-                "semantic-kernel package not installed. Please add 'semantic-kernel>=1.35.0' to requirements and install."
-            )
-        
-        endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT", cfg.azure_openai.endpoint)
-        api_key = os.environ.get("AZURE_OPENAI_API_KEY", cfg.azure_openai.api_key)
+
+        self.endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT", cfg.azure_openai.endpoint)
+        self.api_key = os.environ.get("AZURE_OPENAI_API_KEY", cfg.azure_openai.api_key)
         self.deployment = os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT", cfg.azure_openai.deployment)
         self.api_version = os.environ.get("AZURE_OPENAI_API_VERSION", cfg.azure_openai.api_version)
+        self.batch_deployment = os.environ.get("AZURE_OPENAI_BATCH_DEPLOYMENT", cfg.azure_openai.batch_deployment)
         self.max_chars_per_chunk = cfg.azure_openai.max_chars_per_chunk or 12000
+        self.max_tokens_per_chunk = cfg.azure_openai.max_tokens_per_chunk or 3000
+        # Token-based budgeting when tiktoken (and its encoding data) is available; char-based
+        # otherwise. Resolved on first chunking (_ensure_encoding), not here.
+        self._encoding: Any = None
+        self._encoding_resolved = False
+        self._chunk_limit = self.max_chars_per_chunk
+        self.max_tokens_chunk = max(1, cfg.azure_openai.max_tokens_chunk)
+        self.max_tokens_synthesis = max(1, cfg.azure_openai.max_tokens_synthesis)
+        self.min_llm_chars = max(0, cfg.azure_openai.min_llm_chars)
+        self.chunk_overlap = max(0, cfg.azure_openai.chunk_overlap)
         self.chunk_workers = max(1, getattr(cfg.azure_openai, "chunk_workers", 1))
-        
-        # Initialize Semantic Kernel
-        self.kernel = Kernel()
-        self.chat_service = AzureChatCompletion(
-            deployment_name=self.deployment,
-            api_key=api_key,
-            endpoint=endpoint,
-            api_version=self.api_version
-        )
-        self.kernel.add_service(self.chat_service)
+        self.batch_poll_seconds = max(1, cfg.azure_openai.batch_poll_seconds)
+        self.batch_sla_seconds = max(0, cfg.azure_openai.batch_sla_seconds)
+        self._cache = ResponseCache(cfg.azure_openai.cache_backend, cfg.azure_openai.cache_ttl_seconds)
+        self._limiter = RateLimiter(cfg.azure_openai.tpm_limit, cfg.azure_openai.rpm_limit)
+        self.retry_attempts = max(1, cfg.azure_openai.retry_attempts)
+        self.retry_max_wait_seconds = max(1, cfg.azure_openai.retry_max_wait_seconds)
+        self._checkpoint = ChunkCheckpoint(cfg.azure_openai.checkpoint_path)
 
-    def _get_chat_completion(self, messages: List[dict], max_tokens: int = 300, temperature: float = 0.2) -> str:
-        """Helper method to get chat completion synchronously using Semantic Kernel."""
-        async def _async_chat_completion():
-            chat_history = ChatHistory()
-            for message in messages:
-                if message["role"] == "system":
-                    chat_history.add_system_message(message["content"])
-                elif message["role"] == "user":
-                    chat_history.add_user_message(message["content"])
-                elif message["role"] == "assistant":
-                    chat_history.add_assistant_message(message["content"])
-            
-            settings = AzureChatPromptExecutionSettings(
-                max_tokens=max_tokens,
-                temperature=temperature
+        # Semantic Kernel and its chat service are created on the first chat call (_ensure_service).
+        self.kernel: Any = None
+        self.chat_service: Any = None
+        self._service_loop: Optional[asyncio.AbstractEventLoop] = None  # loop the service is bound to
+        # Persistent event loop for synchronous calls; created lazily by _run.
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+
+    async def _chat_async(
+        self, messages: List[dict], max_tokens: int = 300, temperature: float = TEMPERATURE, cache_key: Optional[str] = None
+    ) -> str:
+        """Await a single chat completion from the Semantic Kernel Azure OpenAI service.
+
+        Identical requests are answered from the response cache when enabled; ``cache_key``
+        overrides the default key over the full request (see ``_chunk_key``). Transient failures
+        (throttling, timeouts, 5xx) are retried up to ``retry_attempts`` times in total with
+        jittered exponential backoff.
+        """
+        key = cache_key or make_key(self.deployment, max_tokens, temperature, messages)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        service = self._ensure_service()
+        attempt = 0
+        while True:
+            if self._limiter.enabled:
+                await self._limiter.acquire(estimate_tokens(messages, max_tokens))
+            chat_history, settings = self._request(messages, max_tokens, temperature)
+            try:
+                response = await service.get_chat_message_content(chat_history, settings)
+                break
+            except Exception as exc:
+                attempt += 1
+                if attempt >= self.retry_attempts or not is_retryable(exc):
+                    raise
+                await asyncio.sleep(retry_delay(exc, attempt, self.retry_max_wait_seconds))
+        result = str(response) if response else ""
+        if result:
+            self._cache.set(key, result)
+        return result
+
+    async def _chat_stream_async(
+        self, messages: List[dict], max_tokens: int = 300, temperature: float = TEMPERATURE
+    ) -> AsyncIterator[str]:
+        """Like ``_chat_async`` but yield the completion in pieces as the service streams it.
+
+        A cached response is yielded whole; a streamed one is cached once it has completed. A
+        transient failure is retried as in ``_chat_async`` only if nothing has been yielded yet.
+        """
+        key = make_key(self.deployment, max_tokens, temperature, messages)
+        cached = self._cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        service = self._ensure_service()
+        attempt = 0
+        pieces: List[str] = []
+        while True:
+            if self._limiter.enabled:
+                await self._limiter.acquire(estimate_tokens(messages, max_tokens))
+            chat_history, settings = self._request(messages, max_tokens, temperature)
+            try:
+                async for chunk in service.get_streaming_chat_message_content(chat_history, settings):
+                    piece = str(chunk) if chunk else ""
+                    if piece:
+                        pieces.append(piece)
+                        yield piece
+                break
+            except Exception as exc:
+                attempt += 1
+                if pieces or attempt >= self.retry_attempts or not is_retryable(exc):
+                    raise
+                await asyncio.sleep(retry_delay(exc, attempt, self.retry_max_wait_seconds))
+        result = "".join(pieces)
+        if result:
+            self._cache.set(key, result)
+
+    def _ensure_service(self) -> Any:
+        """Create the kernel and Azure chat service on first use, bound to the running loop.
+
+        Called from coroutines only, either on the client's private loop or on an async caller's
+        loop; the service's connection pool then belongs to that loop.
+
+        Raises:
+            RuntimeError: if the semantic-kernel package is not installed, or if the service was
+                already created on a different event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self.chat_service is not None and self._service_loop is not loop:
+            raise RuntimeError(
+                "LLMClient is bound to the event loop it was first used on; create one client per "
+                "event loop (or close() / aclose() it before switching loops)."
+            )
+        if self.chat_service is None:
+            sk = _sk()
+            self.kernel = sk.Kernel()
+            self.chat_service = sk.AzureChatCompletion(
+                deployment_name=self.deployment,
+                api_key=self.api_key,
+                endpoint=self.endpoint,
+                api_version=self.api_version
             )
-            
-            response = await self.chat_service.get_chat_message_content(chat_history, settings)
-            return str(response) if response else ""
-        
-        # Run the async function in the current event loop or create a new one
+            self.kernel.add_service(self.chat_service)
+            self._service_loop = loop
+        return self.chat_service
+
+    @staticmethod
+    def _request(messages: List[dict], max_tokens: int, temperature: float) -> Tuple[Any, Any]:
+        """Build the ChatHistory and execution settings for one chat request."""
+        sk = _sk()
+        chat_history = sk.ChatHistory()
+        for message in messages:
+            sk.adders[message["role"]](chat_history, message["content"])
+        # The service writes per-request state (messages, stream flag) onto the settings object,
+        # so concurrent calls each get a shallow copy of the cached, already-validated instance.
+        return chat_history, _settings(max_tokens, temperature).model_copy()
+
+    def _get_chat_completion(self, messages: List[dict], max_tokens: int = 300, temperature: float = TEMPERATURE) -> str:
+        """Helper method to get chat completion synchronously using Semantic Kernel."""
+        return self._run(self._chat_async(messages, max_tokens, temperature))
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the client's persistent event loop and block for its result.
+
+        One loop (on a daemon thread, started on first use) serves every synchronous call, so the
+        chat service's HTTP connection pool stays bound to a single loop and is reused across
+        calls instead of being rebuilt with a fresh loop each time.
+        """
+        return self._submit(coro).result()
+
+    def _submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """Schedule a coroutine on the persistent loop (starting it if needed) without waiting.
+
+        Raises:
+            RuntimeError: if called from inside a running event loop. Blocking there would stall
+                that loop (or deadlock, on the client's own loop thread); async callers should
+                await ``summarize_async`` / ``summarize_stream`` / ``summarize_batch_async``.
+        """
         try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # If there's already a running loop, we need to run in a thread
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, _async_chat_completion())
-                    return future.result()
-            else:
-                return loop.run_until_complete(_async_chat_completion())
+            asyncio.get_running_loop()
         except RuntimeError:
-            # No event loop, create a new one
-            return asyncio.run(_async_chat_completion())
-
-    def _chunk(self, text: str) -> List[str]:
-        if len(text) <= self.max_chars_per_chunk:
-            return [text]
-        chunks: List[str] = []
-        start = 0
-        step = self.max_chars_per_chunk
-        while start < len(text):
-            end = min(len(text), start + step)
-            chunks.append(text[start:end])
-            start = end
-        return chunks
+            pass
+        else:
+            coro.close()
+            raise RuntimeError(
+                "LLMClient synchronous methods cannot be used inside a running event loop; "
+                "use 'await llm.summarize_async(...)' (or summarize_stream / summarize_batch_async) instead."
+            )
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name="llm-loop", daemon=True)
+                self._loop_thread.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def close(self) -> None:
+        """Close the chat service's HTTP client and stop the background loop (if started).
+
+        Safe to call more than once; also invoked on ``with LLMClient(cfg) as llm:`` exit. The
+        kernel and chat service are dropped too, so a later call starts cleanly with new ones
+        instead of reusing a closed HTTP client. A service created on an async caller's loop can
+        only be closed on that loop; use ``aclose`` there.
+        """
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        service, service_loop = self.chat_service, self._service_loop
+        self.chat_service = self.kernel = self._service_loop = None
+        if loop is not None:
+            # Connections were opened on this loop, so they must be closed on it too.
+            client = getattr(service, "client", None) if service_loop is loop else None
+            if client is not None and hasattr(client, "close"):
+                try:
+                    asyncio.run_coroutine_threadsafe(client.close(), loop).result(timeout=5)
+                except Exception:
+                    pass
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    async def aclose(self) -> None:
+        """Async counterpart of ``close`` for a client used from the caller's event loop.
+
+        Closes the chat service's HTTP client if it was created on the running loop, then stops
+        the background loop as ``close`` does; also invoked on ``async with LLMClient(cfg)`` exit.
+        """
+        if self.chat_service is not None and self._service_loop is asyncio.get_running_loop():
+            client = getattr(self.chat_service, "client", None)
+            self.chat_service = self.kernel = self._service_loop = None
+            if client is not None and hasattr(client, "close"):
+                try:
+                    await client.close()
+                except Exception:
+                    pass
+        self.close()
+
+    async def __aenter__(self) -> "LLMClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def __enter__(self) -> "LLMClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _ensure_encoding(self) -> None:
+        """Load the tokenizer on first use and set the chunk budget to tokens or characters."""
+        if not self._encoding_resolved:
+            self._encoding = _load_encoding(self.deployment)
+            self._chunk_limit = self.max_tokens_per_chunk if self._encoding else self.max_chars_per_chunk
+            self._encoding_resolved = True
+
+    def _token_offsets(self, text: str) -> Optional[List[int]]:
+        """Start offset in ``text`` of each token, from a single encode of the whole document.
+
+        None when chunking by characters.
+        """
+        if not self._encoding:
+            return None
+        # encode_ordinary: text such as "<|endoftext|>" in a document is content, not a special token.
+        _, offsets = self._encoding.decode_with_offsets(self._encoding.encode_ordinary(text))
+        return offsets
+
+    @staticmethod
+    def _span_size(offsets: Optional[List[int]], start: int, end: int) -> int:
+        """Size of ``text[start:end]`` in the unit of the chunk budget (tokens or characters).
+
+        In token mode this counts the tokens starting inside the span, so no substring is
+        re-encoded; a token straddling a boundary counts toward the span it starts in.
+        """
+        if offsets is None:
+            return end - start
+        return bisect.bisect_left(offsets, end) - bisect.bisect_left(offsets, start)
+
+    def _chunk_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Compute chunk boundaries as (start, end) offsets into ``text``.
+
+        Chunks are exact substrings of the source; no intermediate copies of the document are
+        built. The spans do not overlap: dedupe and cache keys are computed on them, and the
+        overlap is only added to the prompt text (see ``_overlap_start``).
+        """
+        self._ensure_encoding()
+        return self._split_spans(text, 0, len(text), 0, self._token_offsets(text))
+
+    def _overlap_start(self, text: str, spans: List[Tuple[int, int]], i: int) -> int:
+        """Start offset of chunk ``i``'s prompt text, reaching back into the previous span.
+
+        Each chunk after the first is sent with up to ``chunk_overlap`` preceding characters
+        (starting at a word boundary) so context carries across splits; the overlap is on top of
+        the chunk budget.
+        """
+        start = spans[i][0]
+        if i == 0 or self.chunk_overlap <= 0:
+            return start
+        prev_start = spans[i - 1][0]
+        lo = max(prev_start, start - self.chunk_overlap)
+        m = _WS_RE.search(text, lo, start)
+        if m and lo > prev_start:
+            lo = m.end()
+        return lo
+
+    def _split_spans(
+        self, text: str, start: int, end: int, level: int, offsets: Optional[List[int]]
+    ) -> List[Tuple[int, int]]:
+        """Recursively split ``text[start:end]`` into spans within the budget (see ``_SPLIT_LEVELS``).
+
+        Pieces between separator matches at the current level are packed greedily; a piece that
+        alone exceeds the budget is split at the next level down, and only a single oversized
+        word is sliced.
+        """
+        limit = self._chunk_limit
+        if self._span_size(offsets, start, end) <= limit:
+            return [(start, end)]
+        if level == len(_SPLIT_LEVELS):
+            return self._hard_split_spans(start, end, offsets)
+        pieces = []
+        pos = start
+        for m in _SPLIT_LEVELS[level].finditer(text, start, end):
+            pieces.append((pos, m.start()))
+            pos = m.end()
+        pieces.append((pos, end))
+
+        spans: List[Tuple[int, int]] = []
+        buf_start: Optional[int] = None
+        buf_end = buf_size = 0
+        for ps, pe in pieces:
+            if not _NON_WS_RE.search(text, ps, pe):
+                continue
+            n = self._span_size(offsets, ps, pe)
+            if n > limit:
+                if buf_start is not None:
+                    spans.append((buf_start, buf_end))
+                    buf_start = None
+                spans.extend(self._split_spans(text, ps, pe, level + 1, offsets))
+                continue
+            if buf_start is not None:
+                gap = self._span_size(offsets, buf_end, ps)
+                if buf_size + gap + n > limit:
+                    spans.append((buf_start, buf_end))
+                    buf_start = None
+                else:
+                    buf_size += gap + n
+            if buf_start is None:
+                buf_start, buf_size = ps, n
+            buf_end = pe
+        if buf_start is not None:
+            spans.append((buf_start, buf_end))
+        return spans
+
+    def _hard_split_spans(self, start: int, end: int, offsets: Optional[List[int]]) -> List[Tuple[int, int]]:
+        """Last resort for a single word over budget: cut every ``limit`` tokens (or characters)."""
+        limit = self._chunk_limit
+        if offsets is not None:
+            first, last = bisect.bisect_left(offsets, start), bisect.bisect_left(offsets, end)
+            cuts = [start] + [offsets[i] for i in range(first + limit, last, limit)]
+        else:
+            cuts = list(range(start, end, limit))
+        return [(a, b) for a, b in zip(cuts, cuts[1:] + [end]) if a < b]
 
     def summarize(self, text: str, system_prompt: Optional[str] = None, user_prompt: Optional[str] = None) -> str:
-        """Summarize large text by chunking then synthesizing using Semantic Kernel.
+        """Synchronous wrapper around ``summarize_async`` (runs on the client's persistent loop)."""
+        return self._run(self.summarize_async(text, system_prompt=system_prompt, user_prompt=user_prompt))
 
-        The method returns raw model text. To request a title + Markdown body, craft the user prompt
-        accordingly (see config.json summarize prompt in this project).
+    async def summarize_async(
+        self, text: str, system_prompt: Optional[str] = None, user_prompt: Optional[str] = None
+    ) -> str:
+        """Summarize large text by chunking then synthesizing; the joined ``summarize_stream`` output.
+
+        The method returns raw model text. To request a title + Markdown body, craft the user
+        prompt accordingly (see config.json summarize prompt in this project).
         """
-        system_prompt = system_prompt or "You are a helpful assistant that writes concise, accurate summaries."
-        user_prompt = user_prompt or (
-            "Summarize the following content in 8-12 bullet points with headings and key takeaways."
-        )
-        chunks = self._chunk(text)
+        return "".join([piece async for piece in self.summarize_stream(text, system_prompt, user_prompt)])
 
-        if len(chunks) == 1:
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"{user_prompt}\n\nCONTENT:\n" + chunks[0]},
-            ]
-            return self._get_chat_completion(messages, max_tokens=300, temperature=0.2)
+    def iter_summary(
+        self,
+        text: str,
+        system_prompt: Optional[str] = None,
+        user_prompt: Optional[str] = None,
+        on_partial: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[str]:
+        """Synchronous generator over ``summarize_stream``, fed from the client's persistent loop.
 
-        def _summarize_chunk(args: Tuple[int, str, int]) -> Tuple[int, str]:
-            idx, content, total = args
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Chunk {idx}/{total}. {user_prompt}\n\nCONTENT:\n" + content},
-            ]
-            result = self._get_chat_completion(messages, max_tokens=300, temperature=0.2)
-            return idx, result or ""
-
-        partial_summaries: List[str] = ["" for _ in chunks]
-        if self.chunk_workers > 1 and len(chunks) > 1:
-            with ThreadPoolExecutor(max_workers=self.chunk_workers) as ex:
-                futures = [ex.submit(_summarize_chunk, (i, c, len(chunks))) for i, c in enumerate(chunks, start=1)]
-                for fut in as_completed(futures):
-                    idx, result = fut.result()
-                    partial_summaries[idx - 1] = result
+        Lets synchronous callers print the final summary as it is generated. Errors raised while
+        summarizing are re-raised here once the stream ends.
+        """
+        pieces: "queue.Queue[object]" = queue.Queue()
+        done = object()
+
+        async def _pump() -> None:
+            try:
+                async for piece in self.summarize_stream(text, system_prompt, user_prompt, on_partial):
+                    pieces.put(piece)
+            finally:
+                pieces.put(done)
+
+        future = self._submit(_pump())
+        while True:
+            piece = pieces.get()
+            if piece is done:
+                break
+            yield piece  # type: ignore[misc]
+        future.result()
+
+    async def summarize_stream(
+        self,
+        text: str,
+        system_prompt: Optional[str] = None,
+        user_prompt: Optional[str] = None,
+        on_partial: Optional[Callable[[int, int], None]] = None,
+    ) -> AsyncIterator[str]:
+        """Summarize ``text`` and yield the final summary in pieces as the model streams it.
+
+        Chunk requests are issued concurrently, with at most ``chunk_workers`` in flight at once;
+        ``on_partial(done, total)`` (called on the client's loop thread) reports each chunk as it
+        finishes. The synthesis request is streamed, so the first output arrives at synthesis
+        time-to-first-token rather than after the whole completion.
+
+        Text shorter than ``min_llm_chars`` (after stripping) is returned as-is without a model
+        call; a summary of it would not be shorter.
+        """
+        stripped = text.strip()
+        if len(stripped) < self.min_llm_chars:
+            yield stripped
+            return
+        system_prompt = system_prompt or DEFAULT_SYSTEM_PROMPT
+        user_prompt = user_prompt or DEFAULT_USER_PROMPT
+        spans = self._chunk_spans(text)
+
+        if len(spans) == 1:
+            start, end = spans[0]
+            messages = self._chunk_messages(text[start:end], 1, 1, system_prompt, user_prompt)
+            max_tokens = self.max_tokens_synthesis  # no synthesis follows; this is the final output
         else:
-            for idx, c in enumerate(chunks, start=1):
-                _, result = _summarize_chunk((idx, c, len(chunks)))
-                partial_summaries[idx - 1] = result
-
-        synthesis_prompt = (
-            "You will receive multiple partial summaries from segments of a document. Produce the final requested "
-            "output exactly per the user instructions (which may include returning a title and Markdown body). "
-            "Keep factual fidelity."
-        )
-        messages = [
+            # chunk_workers bounds how many chunk requests are in flight (1 = one at a time).
+            sem = asyncio.Semaphore(self.chunk_workers)
+            owners = self._chunk_owners(text, spans)
+            firsts = sorted(set(owners))
+            summaries = {}
+            tasks = [
+                asyncio.ensure_future(
+                    self._summarize_chunk_async(
+                        i + 1, text, spans[i], self._overlap_start(text, spans, i), len(spans),
+                        system_prompt, user_prompt, sem,
+                    )
+                )
+                for i in firsts
+            ]
+            try:
+                for done, finished in enumerate(asyncio.as_completed(tasks), start=1):
+                    idx, result = await finished
+                    summaries[idx - 1] = result
+                    if on_partial:
+                        on_partial(done, len(firsts))
+            except BaseException:
+                # One chunk failed (after retries): stop the rest rather than paying for them.
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            max_tokens = self._synthesis_tokens(len(owners))
+            partial_summaries = await self._reduce_partials(
+                [summaries[owner] for owner in owners], system_prompt, user_prompt
+            )
+            messages = self._synthesis_messages(partial_summaries, system_prompt, user_prompt)
+        async for piece in self._chat_stream_async(messages, max_tokens=max_tokens, temperature=TEMPERATURE):
+            yield piece
+
+    async def _synthesize(self, parts: List[str], system_prompt: str, user_prompt: str) -> str:
+        """Combine partial summaries into the final output (see ``_reduce_partials``)."""
+        max_tokens = self._synthesis_tokens(len(parts))
+        parts = await self._reduce_partials(parts, system_prompt, user_prompt)
+        messages = self._synthesis_messages(parts, system_prompt, user_prompt)
+        return await self._chat_async(messages, max_tokens=max_tokens, temperature=TEMPERATURE)
+
+    def _synthesis_tokens(self, n_parts: int) -> int:
+        """Completion budget for combining ``n_parts`` partials: grows with the document, capped."""
+        return min(self.max_tokens_synthesis, 150 + 50 * n_parts)
+
+    async def _reduce_partials(self, parts: List[str], system_prompt: str, user_prompt: str) -> List[str]:
+        """Tree-reduce partial summaries until they fit one synthesis request.
+
+        While the partials total more than ``max_chars_per_chunk`` characters, consecutive partials
+        are grouped greedily under that size and each group is merged into one intermediate summary
+        (concurrently, bounded by ``chunk_workers``). This keeps the final synthesis input bounded
+        regardless of document length.
+        """
+        limit = self.max_chars_per_chunk
+        sem = asyncio.Semaphore(self.chunk_workers)
+
+        async def _merge(group: List[str]) -> str:
+            if len(group) == 1:
+                return group[0]
+            messages = self._synthesis_messages(group, system_prompt, user_prompt, MERGE_PROMPT)
+            async with sem:
+                return await self._chat_async(
+                    messages, max_tokens=self._synthesis_tokens(len(group)), temperature=TEMPERATURE
+                ) or ""
+
+        while len(parts) > 1 and sum(len(p) for p in parts) > limit:
+            groups: List[List[str]] = [[]]
+            size = 0
+            for part in parts:
+                if groups[-1] and size + len(part) > limit:
+                    groups.append([])
+                    size = 0
+                groups[-1].append(part)
+                size += len(part)
+            if len(groups) == len(parts):  # every partial alone fills the budget; merge pairwise
+                groups = [parts[i:i + 2] for i in range(0, len(parts), 2)]
+            parts = list(await asyncio.gather(*[_merge(group) for group in groups]))
+        return parts
+
+    async def _summarize_chunk_async(
+        self,
+        idx: int,
+        text: str,
+        span: Tuple[int, int],
+        context_start: int,
+        total: int,
+        system_prompt: str,
+        user_prompt: str,
+        sem: asyncio.Semaphore,
+    ) -> Tuple[int, str]:
+        """Summarize ``text[context_start:span end]`` as ``(idx, summary)``, holding ``sem`` for the model call.
+
+        The chunk string is only sliced once a slot is acquired, so at most ``chunk_workers``
+        chunk copies exist at a time. The cache/checkpoint key covers ``text[span]`` only, without
+        the overlap. Completed summaries are recorded in (and, on a re-run, read back from) the
+        ``checkpoint_path`` file when one is configured.
+        """
+        async with sem:
+            content = text[context_start:span[1]]
+            messages = self._chunk_messages(content, idx, total, system_prompt, user_prompt)
+            key = self._chunk_key(text[span[0]:span[1]], self.max_tokens_chunk, system_prompt, user_prompt)
+            result = self._checkpoint.get(key)
+            if result is None:
+                result = await self._chat_async(
+                    messages, max_tokens=self.max_tokens_chunk, temperature=TEMPERATURE, cache_key=key
+                )
+                if result:
+                    self._checkpoint.add(key, result)
+        return idx, result or ""
+
+    def _chunk_key(self, content: str, max_tokens: int, system_prompt: str, user_prompt: str) -> str:
+        """Cache/checkpoint key for a chunk request, leaving out its "Chunk i/N" position label.
+
+        ``content`` is the chunk's own span, without the overlap borrowed from the previous chunk.
+        The label and the overlap only give the model context; keying without them lets the same
+        chunk text hit the cache at any position and in any document.
+        """
+        return make_key(self.deployment, max_tokens, TEMPERATURE, self._chunk_messages(content, 1, 1, system_prompt, user_prompt))
+
+    @staticmethod
+    def _chunk_owners(text: str, spans: List[Tuple[int, int]]) -> List[int]:
+        """For each span, the index of the first span with the same whitespace-normalized text.
+
+        Repeated boilerplate (headers, footers, navigation) then costs one model call, whose result
+        is reused at every position it occurs.
+        """
+        first_by_hash = {}
+        owners = []
+        for i, (start, end) in enumerate(spans):
+            normalized = _WS_RUN_RE.sub(" ", text[start:end]).strip()
+            digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+            owners.append(first_by_hash.setdefault(digest, i))
+        return owners
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _prompt_prefix(system_prompt: str, user_prompt: str) -> Tuple[dict, ...]:
+        """Static leading messages shared by every request for a document, built once per prompt pair.
+
+        Keeping the instructions in their own message ahead of any variable content makes this
+        prefix bit-identical across chunk and synthesis calls, which is what Azure OpenAI prompt
+        caching keys on. The message dicts are shared between requests and must not be mutated.
+        """
+        return (
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": synthesis_prompt + "\n\nPARTIAL SUMMARIES:\n" + "\n\n".join(partial_summaries)},
+            {"role": "system", "content": user_prompt},
+        )
+
+    @classmethod
+    def _chunk_messages(cls, content: str, idx: int, total: int, system_prompt: str, user_prompt: str) -> List[dict]:
+        """Messages for summarizing one chunk (or the whole text when total == 1)."""
+        body = f"Chunk {idx}/{total}.\n\nCONTENT:\n{content}" if total > 1 else f"CONTENT:\n{content}"
+        return [*cls._prompt_prefix(system_prompt, user_prompt), {"role": "user", "content": body}]
+
+    @classmethod
+    def _synthesis_messages(
+        cls, partial_summaries: List[str], system_prompt: str, user_prompt: str, instruction: str = SYNTHESIS_PROMPT
+    ) -> List[dict]:
+        """Messages for combining per-chunk summaries into the final output (or, with
+        ``MERGE_PROMPT``, into an intermediate summary)."""
+        body = "\n\n".join([instruction, *partial_summaries])
+        return [*cls._prompt_prefix(system_prompt, user_prompt), {"role": "user", "content": body}]
+
+    def summarize_batch(
+        self,
+        texts: List[str],
+        system_prompt: Optional[str] = None,
+        user_prompt: Optional[str] = None,
+        *,
+        realtime_fallback: bool = True,
+    ) -> List[str]:
+        """Synchronous wrapper for ``summarize_batch_async``; returns one summary per text."""
+        return self._run(self.summarize_batch_async(
+            texts, system_prompt, user_prompt, realtime_fallback=realtime_fallback
+        ))
+
+    async def summarize_batch_async(
+        self,
+        texts: List[str],
+        system_prompt: Optional[str] = None,
+        user_prompt: Optional[str] = None,
+        *,
+        realtime_fallback: bool = True,
+    ) -> List[str]:
+        """Summarize several documents via the Azure OpenAI Batch API, then synthesize in real time.
+
+        The chunk requests of every document are submitted as one JSONL batch job (custom_id
+        ``"{doc}:{chunk}"``), which Azure prices at roughly half the real-time rate but completes
+        asynchronously (up to the 24h completion window), so this suits non-interactive runs. The
+        chunk requests go to ``batch_deployment`` (a Global-Batch deployment); synthesis and any
+        real-time fallback use the regular ``deployment``, since batch deployments do not accept
+        real-time calls.
+
+        With ``realtime_fallback``, a job that fails or outlives ``batch_sla_seconds`` is cancelled
+        and its chunks are summarized through the regular chat path, as are individual requests the
+        job reports as failed. Chunk summaries are read from and written to the response cache and
+        the ``checkpoint_path`` file under the same chunk keys as the real-time path, so a repeated
+        run (or a retry after synthesis failed) only submits chunks that have no summary yet.
+        Texts shorter than ``min_llm_chars`` are returned stripped, as in ``summarize_stream``.
+
+        Raises:
+            RuntimeError: if ``batch_deployment`` is not configured, the openai package is missing,
+                or, with ``realtime_fallback`` off, the batch job does not complete or any request
+                in it fails.
+        """
+        if not self.batch_deployment:
+            raise RuntimeError(
+                "azure_openai.batch_deployment (or AZURE_OPENAI_BATCH_DEPLOYMENT) must name a Global-Batch "
+                "deployment to use the Batch API."
+            )
+        system_prompt = system_prompt or DEFAULT_SYSTEM_PROMPT
+        user_prompt = user_prompt or DEFAULT_USER_PROMPT
+        short = [len(text.strip()) < self.min_llm_chars for text in texts]
+        doc_spans = [[] if is_short else self._chunk_spans(text) for text, is_short in zip(texts, short)]
+        doc_owners = [self._chunk_owners(text, spans) for text, spans in zip(texts, doc_spans)]
+        requests = {}  # custom_id -> (messages, max_tokens, cache key)
+        for doc, (text, spans, owners) in enumerate(zip(texts, doc_spans, doc_owners)):
+            # A single-chunk document's chunk summary is its final output.
+            max_tokens = self.max_tokens_synthesis if len(spans) == 1 else self.max_tokens_chunk
+            for i in sorted(set(owners)):
+                start, end = spans[i]
+                requests[f"{doc}:{i + 1}"] = (
+                    self._chunk_messages(
+                        text[self._overlap_start(text, spans, i):end], i + 1, len(spans), system_prompt, user_prompt
+                    ),
+                    max_tokens,
+                    self._chunk_key(text[start:end], max_tokens, system_prompt, user_prompt),
+                )
+
+        # Chunks summarized by an earlier run (checkpoint) or call (cache) are not resubmitted.
+        results = {}
+        for cid, (_, _, key) in requests.items():
+            stored = self._checkpoint.get(key) or self._cache.get(key)
+            if stored is not None:
+                results[cid] = stored
+        pending = {cid: request for cid, request in requests.items() if cid not in results}
+        if len(pending) > 1:  # a single request gains nothing from batching
+            batch_results = {}
+            try:
+                batch_results = await self._run_batch(pending, realtime_fallback)
+            except RuntimeError:
+                if not realtime_fallback:
+                    raise
+            for cid, result in batch_results.items():
+                if result:
+                    self._cache.set(pending[cid][2], result)
+                    self._checkpoint.add(pending[cid][2], result)
+            results.update(batch_results)
+            failed = [cid for cid in pending if cid not in results]
+            if failed and not realtime_fallback:
+                raise RuntimeError(
+                    f"{len(failed)} of {len(pending)} batch requests failed (e.g. '{failed[0]}') "
+                    "and realtime_fallback is off"
+                )
+        missing = [cid for cid in pending if cid not in results]
+        if missing:
+            sem = asyncio.Semaphore(self.chunk_workers)
+
+            async def _realtime(cid: str) -> str:
+                async with sem:
+                    messages, max_tokens, key = requests[cid]
+                    result = await self._chat_async(
+                        messages, max_tokens=max_tokens, temperature=TEMPERATURE, cache_key=key
+                    )
+                    if result:
+                        self._checkpoint.add(key, result)
+                    return result or ""
+
+            results.update(zip(missing, await asyncio.gather(*[_realtime(cid) for cid in missing])))
+
+        async def _finish(doc: int) -> str:
+            if short[doc]:
+                return texts[doc].strip()
+            partials = [results[f"{doc}:{owner + 1}"] for owner in doc_owners[doc]]
+            if len(partials) == 1:
+                return partials[0]
+            return await self._synthesize(partials, system_prompt, user_prompt)
+
+        return list(await asyncio.gather(*[_finish(doc) for doc in range(len(texts))]))
+
+    async def _run_batch(self, requests: dict, realtime_fallback: bool) -> dict:
+        """Submit ``requests`` (custom_id -> (messages, max_tokens, _)) as one batch job; return custom_id -> content.
+
+        Requests that failed inside a completed job are left out of the result. Each Batch API call
+        retries transient failures like a chat request, so a network blip during a long poll does
+        not abandon the job.
+
+        Raises:
+            RuntimeError: if the openai package is missing, a Batch API call fails (the openai error
+                is chained), the job ends in any state other than completed, or (with
+                ``realtime_fallback``) it is still running after ``batch_sla_seconds``, in which
+                case it is cancelled first.
+        """
+        if AsyncAzureOpenAI is None:
+            raise RuntimeError("openai package not installed. Please add 'openai>=1.35.0' to requirements and install.")
+        lines = [
+            json.dumps({
+                "custom_id": cid,
+                "method": "POST",
+                "url": "/chat/completions",
+                "body": {"model": self.batch_deployment, "messages": messages, "max_tokens": max_tokens, "temperature": TEMPERATURE},
+            })
+            for cid, (messages, max_tokens, _) in requests.items()
         ]
-        return self._get_chat_completion(messages, max_tokens=300, temperature=0.2)
+        deadline = time.monotonic() + self.batch_sla_seconds if realtime_fallback and self.batch_sla_seconds else None
+        try:
+            async with AsyncAzureOpenAI(
+                azure_endpoint=self.endpoint, api_key=self.api_key, api_version=self.api_version
+            ) as client:
+                batch_input = await self._batch_call(
+                    client.files.create,
+                    file=("summarize.jsonl", "\n".join(lines).encode("utf-8")),
+                    purpose="batch",
+                )
+                batch = await self._batch_call(
+                    client.batches.create,
+                    input_file_id=batch_input.id,
+                    endpoint="/chat/completions",
+                    completion_window="24h",
+                )
+                while batch.status in ("validating", "in_progress", "finalizing"):
+                    if deadline is not None and time.monotonic() >= deadline:
+                        await self._batch_call(client.batches.cancel, batch.id)
+                        raise RuntimeError(f"Azure OpenAI batch {batch.id} exceeded batch_sla_seconds; cancelled")
+                    await asyncio.sleep(self.batch_poll_seconds)
+                    batch = await self._batch_call(client.batches.retrieve, batch.id)
+                if batch.status != "completed" or not batch.output_file_id:
+                    raise RuntimeError(f"Azure OpenAI batch {batch.id} ended with status '{batch.status}'")
+                output = await self._batch_call(client.files.content, batch.output_file_id)
+        except OpenAIError as exc:
+            raise RuntimeError(f"Azure OpenAI Batch API call failed: {exc}") from exc
+
+        # Output order is not guaranteed; results are matched back by custom_id.
+        results = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            body = (record.get("response") or {}).get("body") or {}
+            choices = body.get("choices") or []
+            if choices:
+                results[record["custom_id"]] = choices[0].get("message", {}).get("content") or ""
+        return results
+
+    async def _batch_call(self, call: Callable[..., Coroutine[Any, Any, T]], *args: Any, **kwargs: Any) -> T:
+        """Await one Batch API call, retrying transient failures as ``_chat_async`` does."""
+        attempt = 0
+        while True:
+            try:
+                return await call(*args, **kwargs)
+            except Exception as exc:
+                attempt += 1
+                if attempt >= self.retry_attempts or not is_retryable(exc):
+                    raise
+                await asyncio.sleep(retry_delay(exc, attempt, self.retry_max_wait_seconds))
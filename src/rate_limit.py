@@ -0,0 +1,78 @@
+"""Client-side rate limiting for Azure OpenAI requests.
+
+Azure OpenAI enforces a deployment's tokens-per-minute (TPM) and requests-per-minute (RPM) quota
+over short windows, so bursting a large document's chunks at full concurrency gets 429s that
+serialize everything behind retries. ``RateLimiter`` paces requests to stay under both limits
+instead: one token bucket for requests and one for (estimated) tokens, each refilled at
+limit / 60 per second. Bucket capacity is a 10-second share of the minute quota, which allows
+short bursts without tripping Azure's sub-minute windows.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+# Bucket capacity as a fraction of the per-minute limit (a 10-second share).
+BURST_FRACTION = 1 / 6
+
+
+class TokenBucket:
+    """Async token bucket: up to ``capacity`` tokens, refilled continuously at ``refill_rate``/s."""
+
+    def __init__(self, capacity: float, refill_rate: float):
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None  # created on first use, inside the running loop
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until ``amount`` tokens are available, then take them.
+
+        Waiters are served in arrival order. A request larger than the bucket waits for a full
+        bucket and then takes its whole ``amount``, leaving the balance negative; later callers
+        wait out that debt, so the long-run rate never exceeds ``refill_rate``.
+        """
+        amount = float(amount)
+        needed = min(amount, self.capacity)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+                self._updated = now
+                if self._tokens >= needed:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((needed - self._tokens) / self.refill_rate)
+
+
+class RateLimiter:
+    """Pace chat requests under a deployment's TPM and RPM quota (0 disables either limit)."""
+
+    def __init__(self, tpm_limit: int = 0, rpm_limit: int = 0):
+        self._tokens = self._bucket(tpm_limit)
+        self._requests = self._bucket(rpm_limit)
+
+    @staticmethod
+    def _bucket(per_minute: int) -> Optional[TokenBucket]:
+        if per_minute <= 0:
+            return None
+        return TokenBucket(capacity=max(1.0, per_minute * BURST_FRACTION), refill_rate=per_minute / 60.0)
+
+    @property
+    def enabled(self) -> bool:
+        return self._tokens is not None or self._requests is not None
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        """Wait for one request slot and ``estimated_tokens`` of token budget."""
+        if self._requests is not None:
+            await self._requests.acquire(1)
+        if self._tokens is not None:
+            await self._tokens.acquire(estimated_tokens)
+
+
+def estimate_tokens(messages: list, max_tokens: int) -> int:
+    """Rough quota cost of a request: ~4 characters per prompt token plus the completion budget."""
+    return sum(len(m["content"]) for m in messages) // 4 + max_tokens
@@ -0,0 +1,59 @@
+"""Persisted SharePoint site/drive ID resolution.
+
+Site and drive IDs are stable for a given ``site_hostname`` / ``site_path`` / ``drive_name``, so
+after the first run they are remembered in ``CACHE_DIR/resolution.json`` and the resolution
+round-trips are skipped. Callers should ``invalidate`` an entry when Graph answers 404 for it
+(library deleted/recreated, site moved) and resolve again.
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from .cache_io import atomic_write_text
+from .config import CACHE_DIR, SharePointSettings
+
+RESOLUTION_CACHE_PATH = os.path.join(CACHE_DIR, "resolution.json")
+
+
+def _key(sp: SharePointSettings) -> str:
+    return f"{sp.site_hostname}|{sp.site_path}|{sp.drive_name}"
+
+
+def _load_all() -> Dict[str, dict]:
+    try:
+        with open(RESOLUTION_CACHE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_all(entries: Dict[str, dict]) -> None:
+    try:
+        atomic_write_text(RESOLUTION_CACHE_PATH, json.dumps(entries, indent=2))
+    except OSError:
+        pass  # caching is an optimization only
+
+
+def lookup(sp: SharePointSettings) -> Optional[Tuple[str, str]]:
+    """Return cached (site_id, drive_id) for the configured library, or None."""
+    entry = _load_all().get(_key(sp))
+    if entry and entry.get("site_id") and entry.get("drive_id"):
+        return entry["site_id"], entry["drive_id"]
+    return None
+
+
+def store(sp: SharePointSettings, site_id: str, drive_id: str) -> None:
+    """Remember resolved IDs for the configured library."""
+    entries = _load_all()
+    entries[_key(sp)] = {"site_id": site_id, "drive_id": drive_id, "ts": time.time()}
+    _save_all(entries)
+
+
+def invalidate(sp: SharePointSettings) -> None:
+    """Forget the cached IDs for the configured library (e.g. after a 404)."""
+    entries = _load_all()
+    if entries.pop(_key(sp), None) is not None:
+        _save_all(entries)
@@ -0,0 +1,56 @@
+"""Retry policy for transient Azure OpenAI failures.
+
+Semantic Kernel wraps the underlying openai exceptions, so a failure is classified by walking its
+``__cause__`` / ``__context__`` chain. Throttling (429), connection errors and timeouts, and 5xx
+responses are retried with exponential backoff and full jitter, honouring ``Retry-After`` when
+the service sends one.
+"""
+
+import random
+from typing import Optional
+
+try:
+    from openai import APIConnectionError, InternalServerError, RateLimitError  # APITimeoutError is an APIConnectionError
+    RETRYABLE_ERRORS: tuple = (APIConnectionError, InternalServerError, RateLimitError)
+except Exception:  # pragma: no cover
+    RETRYABLE_ERRORS = ()
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+MIN_DELAY_SECONDS = 1.0
+
+
+def _chain(exc: BaseException):
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True if ``exc`` (or an exception it wraps) is a transient service or network failure."""
+    for e in _chain(exc):
+        if RETRYABLE_ERRORS and isinstance(e, RETRYABLE_ERRORS):
+            return True
+        if getattr(e, "status_code", None) in RETRYABLE_STATUS:
+            return True
+    return False
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    for e in _chain(exc):
+        headers = getattr(getattr(e, "response", None), "headers", None)
+        if headers:
+            try:
+                return float(headers.get("retry-after"))
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+def retry_delay(exc: BaseException, attempt: int, max_wait: float) -> float:
+    """Seconds to wait before retry number ``attempt`` (1-based), capped at ``max_wait``."""
+    hinted = _retry_after(exc)
+    if hinted is not None:
+        return min(max_wait, max(MIN_DELAY_SECONDS, hinted))
+    return max(MIN_DELAY_SECONDS, random.uniform(0, min(max_wait, 2.0 ** attempt)))